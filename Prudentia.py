@@ -1,9 +1,10 @@
 import streamlit as st
-import requests
-import json
+import streamlit.components.v1 as components
+import httpx
+import orjson
+import diskcache
+import hashlib
 import os
-import folium
-from streamlit_folium import st_folium
 
 # --- 1. API Configuration & Environment Variables ---
 try:
@@ -19,80 +20,220 @@ except Exception as e:
     st.error(f"Error during API configuration: {str(e)}")
     st.stop()
 
+_HEADERS = {
+    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+    "Content-Type": "application/json"
+}
+
 
 # --- 2. API Calls & Business Logic ---
-@st.cache_data(show_spinner="Generating legal guidance...")
-def generate_legal_guidance(case_type, name, phone, email, address, state, form_data, description, documents, witnesses, additional_info):
-    """Generates legal guidance using the OpenRouter API based on user input."""
+# The petition bundled with the guidance is always in this language and written by GUIDANCE_MODEL;
+# petitions in any other language go to the multi-language PETITION_MODEL.
+_BUNDLED_PETITION_LANGUAGE = "English"
+
+# Character caps for the free-text fields that go into the prompts. They bound the prompt tokens
+# billed per call; the generators enforce them and the form widgets mirror them as max_chars.
+_MAX_DESCRIPTION_CHARS = 4000
+_MAX_DOCUMENTS_CHARS = 2000
+_MAX_EVIDENCE_CHARS = 1000
+_MAX_ADDRESS_CHARS = 500
+
+# Line separating the guidance from the petition in generate_combined's reply.
+_PETITION_MARKER = "=== PETITION ==="
+
+# Maps each guidance heading to its section key.
+_SECTION_KEYS = {
+    "Legal Analysis": "analysis",
+    "Required Documents": "documents",
+    "Court Procedure": "procedure",
+    "Your Rights": "rights",
+    "A Quick Summary": "summary",
+}
+
+@st.cache_resource
+def _client():
+    """Returns a pooled HTTP/2 client shared by all OpenRouter calls, so one TLS connection multiplexes every request."""
+    return httpx.Client(
+        headers=_HEADERS,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        # Connection settings live on the transport, which also retries failed connects.
+        transport=httpx.HTTPTransport(http2=True, limits=httpx.Limits(max_keepalive_connections=4), retries=2)
+    )
+
+@st.cache_resource
+def _disk_cache():
+    """Returns the on-disk response cache, which survives restarts and is shared by every session."""
+    return diskcache.Cache("./.prudentia_cache", size_limit=2**30)
+
+def _stream_deltas(payload, finish_reasons):
+    """
+    Yields the content deltas of a streamed (server-sent events) OpenRouter completion.
+    Every finish_reason reported by the stream is appended to finish_reasons; an error chunk raises ValueError.
+    """
+    # The client already sends Content-Type: application/json, so the orjson-encoded body is posted as-is.
+    with _client().stream("POST", OPENROUTER_URL, content=orjson.dumps(payload)) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            # Skip keep-alive comments and the end-of-stream marker.
+            if not line.startswith("data: ") or line == "data: [DONE]":
+                continue
+            chunk = orjson.loads(line[6:])
+            # OpenRouter reports failures after the 200 status line as an "error" chunk.
+            error = chunk.get('error')
+            if error:
+                message = error.get('message', error) if isinstance(error, dict) else error
+                raise ValueError(f"OpenRouter stream error: {message}")
+            if not chunk.get('choices'):
+                continue
+            choice = chunk['choices'][0]
+            if choice.get('finish_reason'):
+                finish_reasons.append(choice['finish_reason'])
+            yield (choice.get('delta') or {}).get('content') or ""
+
+def _chat_completion(model, prompt):
+    """
+    Sends a single-message chat completion to OpenRouter and returns the reply text.
+    Raises httpx.HTTPError if the request fails and ValueError if the reply is malformed or incomplete.
+    Tokens are previewed as they stream in and the preview is cleared once the reply is complete.
+    Replies are kept on disk for a week keyed by the model and prompt, so repeat queries skip the API.
+    """
+    cache = _disk_cache()
+    key = hashlib.sha256((model + prompt).encode()).hexdigest()
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    payload = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "stream": True
+    }
+    finish_reasons = []
+    preview = st.empty()
+    try:
+        with preview.container():
+            content = st.write_stream(_stream_deltas(payload, finish_reasons))
+    finally:
+        preview.empty()
+
+    # A reply that did not finish normally is raised rather than returned, so neither the disk cache
+    # nor the st.cache_data generators keep it and the next attempt calls the API again.
+    finish_reason = finish_reasons[-1] if finish_reasons else None
+    if not content or finish_reason != "stop":
+        raise ValueError(f"the reply was incomplete (finish_reason: {finish_reason})")
+    cache.set(key, content, expire=7 * 86400)
+    return content
+
+def _find_heading(text, title):
+    """Returns the start of the first level-2 ("## ") markdown heading line containing title, or -1."""
+    pos = text.find(title)
+    while pos != -1:
+        line_start = text.rfind("\n", 0, pos) + 1
+        # Sub-headings ("### Your Rights as a Consumer") inside a section are not section starts.
+        if text.startswith("## ", line_start):
+            return line_start
+        pos = text.find(title, pos + len(title))
+    return -1
+
+def _split_sections(text):
+    """
+    Splits the guidance markdown into its five sections, keyed as in _SECTION_KEYS.
+    Each section is sliced from its heading up to the next of the five headings.
+    """
+    starts = sorted(
+        (start, key) for title, key in _SECTION_KEYS.items()
+        if (start := _find_heading(text, title)) != -1
+    )
+    sections = {key: '' for key in _SECTION_KEYS.values()}
+    for i, (start, key) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(text)
+        sections[key] = text[start:end]
+    return sections
+
+def _parse_combined_reply(reply):
+    """
+    Splits generate_combined's reply into the guidance sections and the petition text.
+    A reply without the petition marker is treated as guidance only.
+    """
+    guidance, _, petition = reply.partition(_PETITION_MARKER)
+    return _split_sections(guidance), petition.strip() or None
+
+def _cap_case_fields(address, description, documents, witnesses, additional_info=""):
+    """
+    Truncates the free-text case fields to their caps before they go into a prompt.
+    The widgets' max_chars is only enforced in the browser, so every generator applies the caps through here.
+    """
+    return (
+        (address or "")[:_MAX_ADDRESS_CHARS],
+        (description or "")[:_MAX_DESCRIPTION_CHARS],
+        (documents or "")[:_MAX_DOCUMENTS_CHARS],
+        (witnesses or "")[:_MAX_EVIDENCE_CHARS],
+        (additional_info or "")[:_MAX_EVIDENCE_CHARS],
+    )
+
+def _sign_petition(petition, name, address, phone):
+    """Appends the petitioner's signature block, which is kept out of the cached combined prompt."""
+    return f"{petition.rstrip()}\n{name}\n{address}\n{phone}"
+
+@st.cache_data(show_spinner="Generating legal guidance and drafting your petition...", ttl=86400, max_entries=256)
+def generate_combined(case_type, address, state, description, documents, witnesses, additional_info):
+    """
+    Generates the legal guidance and a petition draft in a single OpenRouter call.
+    Both share most of their context, so one request halves the round trips and prompt tokens.
+    Takes no name or phone, so identical cases from different users share one cache entry;
+    the caller signs the petition with _sign_petition.
+    Returns a dict with the guidance 'sections' and the unsigned English 'petition' text (None if the model omitted it).
+    Failures propagate from _chat_completion so they are not cached; the caller reports them.
+    """
+    address, description, documents, witnesses, additional_info = _cap_case_fields(
+        address, description, documents, witnesses, additional_info
+    )
+
     prompt = f"""
-    As Prudentia, an expert Indian legal advisor, provide self-representation (party-in-person) guidance for a user in {state} with the following legal issue:
+    As Prudentia, an expert Indian legal advisor, help a party-in-person in {state} with the following legal issue:
 
     **Case Type:** {case_type}
-    **Description:** {description}
-    **User Info:** Name: {name}, Address: {address}, State: {state}
+    **Petitioner Details:** Address: {address}, State: {state}
+    **Case Description:** {description}
     **Evidence:** Docs: {documents}, Witnesses: {witnesses}, Other: {additional_info}
 
-    Provide a comprehensive, practical response in five markdown sections:
+    Prepare two things.
+
+    A. Guidance: Comprehensive, practical self-representation guidance in five markdown sections, each starting with a "## " heading:
     1.  **Legal Analysis & Guidance:** Analyze the case, cite relevant Indian laws/precedents, and provide immediate, actionable steps.
     2.  **Required Documents:** List all necessary documents/evidence, noting any format requirements (e.g., stamp paper).
     3.  **Court Procedure:** Outline the step-by-step filing process for a party-in-person and suggest the correct court jurisdiction.
     4.  **Your Rights & Remedies:** Explain the user's rights and potential remedies.
     5.  **A Quick Summary:** Provide a 3-4 sentence summary of the key takeaways.
-
     Use simple Hinglish where appropriate and include a clear disclaimer at the end.
-    """
 
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json"
-    }
+    B. Petition: A formal petition addressed to the concerned authority or court, with the following sections:
+    1.  **To:** [Name of the Concerned Authority/Court], [Address of the Authority/Court]
+    2.  **Subject:** [A concise, formal subject line]
+    3.  **Respected Sir/Madam,**
+    4.  **Introduction:** Start with a formal statement introducing the petitioner and the matter.
+    5.  **Body:** Detail the facts of the case and the legal issue, referencing the case description provided. Explain why you are petitioning.
+    6.  **Prayer:** Clearly state what the petitioner is seeking (e.g., relief, compensation, an order from the court).
+    7.  **Sincerely,** as the last line; the petitioner's signature block is added separately.
+    Write the petition in {_BUNDLED_PETITION_LANGUAGE}. Use formal, respectful legal language suitable for an Indian context. Refer to the petitioner as "the petitioner" and do not include any placeholder text like `[Your Name]`.
 
-    payload = {
-        "model": GUIDANCE_MODEL,
-        "messages": [{"role": "user", "content": prompt}]
-    }
+    Write the guidance first, then a line containing only {_PETITION_MARKER}, then the petition.
+    """
 
-    try:
-        response = requests.post(OPENROUTER_URL, headers=headers, data=json.dumps(payload))
-        response.raise_for_status()
-        full_response = response.json()['choices'][0]['message']['content']
-        
-        sections = {
-            'analysis': '',
-            'documents': '',
-            'procedure': '',
-            'rights': '',
-            'summary': ''
-        }
-        
-        parts = full_response.split("## ")
-        for part in parts:
-            if "Legal Analysis" in part:
-                sections['analysis'] = "## " + part
-            elif "Required Documents" in part:
-                sections['documents'] = "## " + part
-            elif "Court Procedure" in part:
-                sections['procedure'] = "## " + part
-            elif "Your Rights" in part:
-                sections['rights'] = "## " + part
-            elif "A Quick Summary" in part:
-                sections['summary'] = "## " + part
-        
-        return sections
-    
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error calling OpenRouter API: {e}")
-        return None
-    except KeyError:
-        st.error("Error parsing API response. The response format may have changed.")
-        return None
-
-@st.cache_data(show_spinner="Drafting your petition...")
-def generate_petition_text(case_type, name, phone, email, address, state, description, documents, witnesses, language):
+    reply = _chat_completion(GUIDANCE_MODEL, prompt)
+    sections, petition = _parse_combined_reply(reply)
+    return {"sections": sections, "petition": petition}
+
+@st.cache_data(show_spinner="Drafting your petition...", ttl=86400, max_entries=256)
+def generate_petition_text(case_type, name, phone, address, state, description, documents, witnesses, language):
     """
     Generates a draft petition text using the OpenRouter API.
-    Uses the "google/gemma-3n-e4b-it:free" model for generation.
+    English drafts use GUIDANCE_MODEL, matching the draft bundled with the guidance; every other
+    language uses the multi-language "google/gemma-3n-e4b-it:free" model.
+    Failures propagate from _chat_completion so they are not cached; the caller reports them.
     """
+    address, description, documents, witnesses, _ = _cap_case_fields(address, description, documents, witnesses)
+
     prompt = f"""
     Draft a formal petition for a 'party-in-person' in {state}. The petition should be addressed to the concerned authority or court.
 
@@ -118,31 +259,72 @@ def generate_petition_text(case_type, name, phone, email, address, state, descri
     Write the petition in {language}. Use formal, respectful legal language suitable for an Indian context. Do not include any placeholder text like `[Your Name]` in the final response. Use the provided user data directly. The response should be a complete, ready-to-use petition draft.
     """
 
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "model": PETITION_MODEL,
-        "messages": [{"role": "user", "content": prompt}]
-    }
-
-    try:
-        response = requests.post(OPENROUTER_URL, headers=headers, data=json.dumps(payload))
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
-    
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error generating petition draft: {e}")
-        return None
-    except KeyError:
-        st.error("Error parsing API response for petition draft.")
-        return None
+    model = GUIDANCE_MODEL if language == _BUNDLED_PETITION_LANGUAGE else PETITION_MODEL
+    return _chat_completion(model, prompt)
 
 
 # --- 3. Streamlit App Components ---
 
+_CASE_TYPES = (
+    "Consumer Complaint", "Property Dispute", "Family Matter (Divorce/Maintenance)",
+    "Employment Issue", "Landlord-Tenant Dispute", "Police Complaint (FIR)",
+    "Motor Accident Claim", "Bank/Financial Issue", "Public Interest Litigation", "Other"
+)
+
+_STATES = (
+    "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh",
+    "Goa", "Gujarat", "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka",
+    "Kerala", "Madhya Pradesh", "Maharashtra", "Manipur", "Meghalaya", "Mizoram",
+    "Nagaland", "Odisha", "Punjab", "Rajasthan", "Sikkim", "Tamil Nadu",
+    "Telangana", "Tripura", "Uttar Pradesh", "Uttarakhand", "West Bengal",
+    "Delhi", "Jammu and Kashmir", "Ladakh"
+)
+
+_EMERGENCY_CONTACTS_MD = """**🚨 Emergency Legal Contacts:**
+
+- **NALSA Legal Aid Helpline:** 15100
+- **Women's Helpline:** 181
+- **National Consumer Helpline:** 1915
+"""
+
+_PRO_TIPS_MD = """**💡 Pro Tips:**
+
+- Keep all documents organized in a folder.
+- Take photos or videos of evidence.
+- Maintain a written record of all communications.
+- Be aware of filing deadlines (limitation periods).
+"""
+
+# Result section labels mapped to their guidance key and the text shown when the section is missing.
+_RESULT_SECTIONS = {
+    "📊 Summary": ("summary", "No summary found."),
+    "📋 Legal Analysis": ("analysis", "No analysis found."),
+    "📄 Documents Needed": ("documents", "No documents information found."),
+    "🏛️ Court Procedure": ("procedure", "No procedure information found."),
+    "⚖️ Your Rights": ("rights", "No rights information found."),
+}
+
+# Demonstration data for the court finder map.
+_PIN_CODE_MAP = {
+    "110001": {"name": "New Delhi", "coords": (28.6139, 77.2090)},
+    "400001": {"name": "Mumbai", "coords": (18.9750, 72.8258)},
+    "700001": {"name": "Kolkata", "coords": (22.5726, 88.3639)},
+    "600001": {"name": "Chennai", "coords": (13.0827, 80.2707)},
+    "560001": {"name": "Bengaluru", "coords": (12.9716, 77.5946)},
+    "500001": {"name": "Hyderabad", "coords": (17.3850, 78.4867)},
+}
+
+_COURTS_DATA = (
+    {"name": "Supreme Court of India", "coords": (28.6151, 77.2390), "color": "red"},
+    {"name": "Allahabad High Court", "coords": (25.4542, 81.8267), "color": "blue"},
+    {"name": "Bombay High Court", "coords": (18.9221, 72.8335), "color": "blue"},
+    {"name": "Madras High Court", "coords": (13.0886, 80.2858), "color": "blue"},
+    {"name": "Delhi High Court", "coords": (28.6120, 77.2285), "color": "blue"},
+    {"name": "Bandra Kurla Complex Court, Mumbai", "coords": (19.0664, 72.8687), "color": "green"},
+    {"name": "Tis Hazari Courts, Delhi", "coords": (28.6657, 77.2104), "color": "green"},
+    {"name": "Egmore Court, Chennai", "coords": (13.0768, 80.2586), "color": "green"},
+)
+
 def _render_header():
     """Renders the main title, sub-header, and the new Contribute button."""
     col1, col2 = st.columns([4, 1])
@@ -165,24 +347,12 @@ def _render_sidebar():
         st.markdown("---")
 
         with st.expander("📋 Select Legal Issue", expanded=True):
-            case_types = [
-                "Consumer Complaint", "Property Dispute", "Family Matter (Divorce/Maintenance)",
-                "Employment Issue", "Landlord-Tenant Dispute", "Police Complaint (FIR)",
-                "Motor Accident Claim", "Bank/Financial Issue", "Public Interest Litigation", "Other"
-            ]
-            st.session_state.selected_case = st.selectbox("Choose your case type:", case_types)
+            st.session_state.selected_case = st.selectbox("Choose your case type:", _CASE_TYPES)
 
         with st.expander("🔍 Quick Help"):
-            st.markdown("**🚨 Emergency Legal Contacts:**")
-            st.markdown("- **NALSA Legal Aid Helpline:** 15100")
-            st.markdown("- **Women's Helpline:** 181")
-            st.markdown("- **National Consumer Helpline:** 1915")
+            st.markdown(_EMERGENCY_CONTACTS_MD)
             st.markdown("---")
-            st.markdown("**💡 Pro Tips:**")
-            st.markdown("- Keep all documents organized in a folder.")
-            st.markdown("- Take photos or videos of evidence.")
-            st.markdown("- Maintain a written record of all communications.")
-            st.markdown("- Be aware of filing deadlines (limitation periods).")
+            st.markdown(_PRO_TIPS_MD)
 
         _render_map()
 
@@ -210,56 +380,56 @@ def _render_sidebar():
             **I'm Santhosh, a student, innovator, and entrepreneur** passionate about AI, robotics, and business technology. I’ve founded initiatives like Codesphere to teach robotics and AI, and I’m building products such as Chela.AI (AI assistant for teachers) and Zocal (business automation app). My interests also extend to aerospace research and new digital file formats. I believe in using technology to solve real-world problems and create meaningful impact.
             """)
 
+def _build_map(center, zoom):
+    """Builds the folium map of court locations for the given view."""
+    import folium
+
+    m = folium.Map(location=list(center), zoom_start=zoom)
+    for court in _COURTS_DATA:
+        folium.Marker(
+            location=court["coords"],
+            popup=court["name"],
+            icon=folium.Icon(color=court["color"], icon="briefcase", prefix='fa'),
+        ).add_to(m)
+    return m
+
+@st.cache_data
+def _map_html(center, zoom):
+    """Renders the court map to standalone HTML once per (center, zoom) view instead of on every rerun."""
+    return _build_map(center, zoom).get_root().render()
+
+@st.fragment
 def _render_map():
-    """Renders the interactive map with court locations."""
+    """Renders the interactive map with court locations; runs as a fragment so map inputs only rerun the map."""
     with st.expander("🏛️ Find Courts"):
         st.markdown("**🗺️ Find a Court Near You:**")
         
-        pin_code_map = {
-            "110001": {"name": "New Delhi", "coords": [28.6139, 77.2090]},
-            "400001": {"name": "Mumbai", "coords": [18.9750, 72.8258]},
-            "700001": {"name": "Kolkata", "coords": [22.5726, 88.3639]},
-            "600001": {"name": "Chennai", "coords": [13.0827, 80.2707]},
-            "560001": {"name": "Bengaluru", "coords": [12.9716, 77.5946]},
-            "500001": {"name": "Hyderabad", "coords": [17.3850, 78.4867]},
-        }
-        
-        initial_center = [20.5937, 78.9629]
+        # folium is only imported once the user asks for the map.
+        if not st.toggle("Show court map", key="_courts_open"):
+            return
+
+        initial_center = (20.5937, 78.9629)
         initial_zoom = 4
         
         pin_code = st.text_input("Enter your Pin Code to zoom into your district:")
         current_center = initial_center
         current_zoom = initial_zoom
         
-        if pin_code in pin_code_map:
-            coords = pin_code_map[pin_code]["coords"]
+        if pin_code in _PIN_CODE_MAP:
+            coords = _PIN_CODE_MAP[pin_code]["coords"]
             current_center = coords
             current_zoom = 12
-            st.success(f"Zooming to {pin_code_map[pin_code]['name']}!")
+            st.success(f"Zooming to {_PIN_CODE_MAP[pin_code]['name']}!")
         elif pin_code:
             st.warning("Pin code not found in our demonstration data. Showing a map of India instead.")
 
-        m = folium.Map(location=current_center, zoom_start=current_zoom)
-        
-        courts_data = [
-            {"name": "Supreme Court of India", "coords": [28.6151, 77.2390], "color": "red"},
-            {"name": "Allahabad High Court", "coords": [25.4542, 81.8267], "color": "blue"},
-            {"name": "Bombay High Court", "coords": [18.9221, 72.8335], "color": "blue"},
-            {"name": "Madras High Court", "coords": [13.0886, 80.2858], "color": "blue"},
-            {"name": "Delhi High Court", "coords": [28.6120, 77.2285], "color": "blue"},
-            {"name": "Bandra Kurla Complex Court, Mumbai", "coords": [19.0664, 72.8687], "color": "green"},
-            {"name": "Tis Hazari Courts, Delhi", "coords": [28.6657, 77.2104], "color": "green"},
-            {"name": "Egmore Court, Chennai", "coords": [13.0768, 80.2586], "color": "green"},
-        ]
-        
-        for court in courts_data:
-            folium.Marker(
-                location=court["coords"],
-                popup=court["name"],
-                icon=folium.Icon(color=court["color"], icon="briefcase", prefix='fa'),
-            ).add_to(m)
-
-        st_folium(m, width=300, height=300)
+        # The map is read-only, so static HTML is enough; no st_folium round-trip back to Python is needed.
+        map_html = _map_html(current_center, current_zoom)
+        # Newer Streamlit releases deprecate components.html in favour of st.iframe; older ones only have the former.
+        if hasattr(st, "iframe"):
+            st.iframe(map_html, height=300)
+        else:
+            components.html(map_html, height=300)
 
 def _render_case_form():
     """Renders the dynamic case details form based on selected case type."""
@@ -274,39 +444,39 @@ def _render_case_form():
             form_data["complaint_nature"] = st.selectbox("Nature of Complaint", ["Defective Product", "Poor Service", "Unfair Trade Practice", "Overcharging", "Insurance Claim Rejection", "Other"])
             form_data["purchase_date"] = st.date_input("Purchase/Service Date")
             form_data["amount_involved"] = st.number_input("Amount Involved (₹)", min_value=0)
-            description = st.text_area("Describe your complaint in detail *", height=100)
+            description = st.text_area("Describe your complaint in detail *", height=100, max_chars=_MAX_DESCRIPTION_CHARS)
         
         elif selected_case == "Property Dispute":
             form_data["property_type"] = st.selectbox("Property Type", ["Residential", "Commercial", "Agricultural", "Plot/Land"])
             form_data["dispute_type"] = st.selectbox("Dispute Type", ["Ownership Dispute", "Partition", "Boundary Dispute", "Illegal Possession", "Document Issues", "Other"])
             form_data["property_value"] = st.number_input("Approximate Property Value (₹)", min_value=0)
-            description = st.text_area("Describe the property dispute *", height=100)
+            description = st.text_area("Describe the property dispute *", height=100, max_chars=_MAX_DESCRIPTION_CHARS)
         
         elif selected_case == "Family Matter (Divorce/Maintenance)":
             form_data["matter_type"] = st.selectbox("Type of Family Matter", ["Divorce (Mutual Consent)", "Divorce (Contested)", "Child Custody", "Maintenance/Alimony", "Domestic Violence", "Property Rights"])
             form_data["marriage_date"] = st.date_input("Date of Marriage")
             form_data["children"] = st.selectbox("Children involved?", ["No", "Yes"])
-            description = st.text_area("Describe your situation *", height=100)
+            description = st.text_area("Describe your situation *", height=100, max_chars=_MAX_DESCRIPTION_CHARS)
         
         elif selected_case == "Landlord-Tenant Dispute":
             form_data["user_type"] = st.selectbox("You are:", ["Tenant", "Landlord"])
             form_data["dispute_type"] = st.selectbox("Dispute Type", ["Rent Issues", "Eviction Notice", "Deposit Return", "Property Damage", "Lease Violation", "Other"])
             form_data["monthly_rent"] = st.number_input("Monthly Rent (₹)", min_value=0)
-            description = st.text_area("Describe the dispute *", height=100)
+            description = st.text_area("Describe the dispute *", height=100, max_chars=_MAX_DESCRIPTION_CHARS)
 
         elif selected_case == "Employment Issue":
             form_data["role"] = st.text_input("Your Role/Designation")
             form_data["issue_type"] = st.selectbox("Issue Type", ["Unfair Termination", "Salary/Wage Dispute", "Harassment", "Workplace Safety", "Leave/Benefits Issues", "Other"])
-            description = st.text_area("Describe your employment issue *", height=100)
+            description = st.text_area("Describe your employment issue *", height=100, max_chars=_MAX_DESCRIPTION_CHARS)
 
         elif selected_case == "Police Complaint (FIR)":
             form_data["crime_type"] = st.text_input("Type of Offense (e.g., Theft, Cheating, Assault)")
             form_data["date_of_incident"] = st.date_input("Date of Incident")
             form_data["location_of_incident"] = st.text_input("Location of Incident")
-            description = st.text_area("Describe the incident in detail *", height=100)
+            description = st.text_area("Describe the incident in detail *", height=100, max_chars=_MAX_DESCRIPTION_CHARS)
         
         else:
-            description = st.text_area("Describe your legal issue in detail *", height=150)
+            description = st.text_area("Describe your legal issue in detail *", height=150, max_chars=_MAX_DESCRIPTION_CHARS)
             form_data["amount_involved"] = st.number_input("Amount Involved (if any) (₹)", min_value=0)
 
         st.session_state.description = description
@@ -318,7 +488,8 @@ def _render_evidence_section():
         st.markdown("**List documents you have:**")
         st.session_state.documents = st.text_area(
             "List all documents you currently possess",
-            placeholder="Example: Aadhaar card, Purchase receipt, Email correspondence, Photos, etc."
+            placeholder="Example: Aadhaar card, Purchase receipt, Email correspondence, Photos, etc.",
+            max_chars=_MAX_DOCUMENTS_CHARS
         )
         st.markdown("**Upload documents (optional):**")
         st.session_state.uploaded_files = st.file_uploader(
@@ -328,34 +499,31 @@ def _render_evidence_section():
         )
 
         st.markdown("**Additional Evidence:**")
-        st.session_state.witnesses = st.text_area("Witness details (if any)")
-        st.session_state.additional_info = st.text_area("Any other relevant information")
-
-def _render_results_tabs(guidance):
-    """Displays the AI-generated guidance in a tabbed interface."""
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "📊 Summary", "📋 Legal Analysis", "📄 Documents Needed",
-        "🏛️ Court Procedure", "⚖️ Your Rights"
-    ])
-    
-    with tab1:
-        st.subheader("Quick Summary")
-        st.markdown(guidance.get('summary', 'No summary found.'))
+        st.session_state.witnesses = st.text_area("Witness details (if any)", max_chars=_MAX_EVIDENCE_CHARS)
+        st.session_state.additional_info = st.text_area("Any other relevant information", max_chars=_MAX_EVIDENCE_CHARS)
 
-    with tab2:
-        st.markdown(guidance.get('analysis', 'No analysis found.'))
-    
-    with tab3:
-        st.markdown(guidance.get('documents', 'No documents information found.'))
-    
-    with tab4:
-        st.markdown(guidance.get('procedure', 'No procedure information found.'))
-    
-    with tab5:
-        st.markdown(guidance.get('rights', 'No rights information found.'))
+@st.fragment
+def _render_results(guidance):
+    """
+    Displays the AI-generated guidance one section at a time.
+    A radio is used instead of st.tabs since it exposes the selection, so only the active section is rendered;
+    it runs as a fragment so switching sections only reruns this section.
+    """
+    selected = st.radio(
+        "Guidance section",
+        list(_RESULT_SECTIONS),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="guidance_section"
+    )
+    key, fallback = _RESULT_SECTIONS[selected]
+    if key == 'summary':
+        st.subheader("Quick Summary")
+    st.markdown(guidance.get(key) or fallback)
 
+@st.fragment
 def _render_feedback_section():
-    """Renders a simple feedback mechanism."""
+    """Renders a simple feedback mechanism; runs as a fragment so a feedback click only reruns this section."""
     st.markdown("---")
     st.subheader("Was this guidance helpful?")
     col_helpful, col_unhelpful = st.columns(2)
@@ -379,19 +547,33 @@ def _render_editable_petition():
     )
 
     if st.button("Draft Petition", key="draft_petition_button", type="primary", use_container_width=True):
-        petition_text = generate_petition_text(
-            st.session_state.selected_case,
-            st.session_state.name,
-            st.session_state.phone,
-            st.session_state.email,
-            st.session_state.address,
-            st.session_state.state,
-            st.session_state.description,
-            st.session_state.documents,
-            st.session_state.witnesses,
-            petition_language
-        )
-        st.session_state.petition_text = petition_text
+        # Reuse the draft that came with the guidance when it is in the requested language and the
+        # case details are unchanged; the signature is added now so later name/phone edits are picked up.
+        bundled = st.session_state.combined_petition
+        if (bundled and petition_language == _BUNDLED_PETITION_LANGUAGE
+                and bundled["inputs"] == _combined_inputs()):
+            st.session_state.petition_text = _sign_petition(
+                bundled["petition"],
+                st.session_state.name,
+                st.session_state.address,
+                st.session_state.phone
+            )
+        else:
+            try:
+                st.session_state.petition_text = generate_petition_text(
+                    st.session_state.selected_case,
+                    st.session_state.name,
+                    st.session_state.phone,
+                    st.session_state.address,
+                    st.session_state.state,
+                    st.session_state.description,
+                    st.session_state.documents,
+                    st.session_state.witnesses,
+                    petition_language
+                )
+            except (httpx.HTTPError, ValueError) as e:
+                st.error(f"Error generating petition draft: {e}")
+                st.session_state.petition_text = ""
 
     if "petition_text" in st.session_state and st.session_state.petition_text:
         st.text_area(
@@ -412,16 +594,8 @@ def _display_main_form():
         st.session_state.name = st.text_input("Full Name *")
         st.session_state.phone = st.text_input("Phone Number *")
         st.session_state.email = st.text_input("Email (optional)")
-        st.session_state.address = st.text_area("Complete Address *")
-        states_of_india = [
-            "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh",
-            "Goa", "Gujarat", "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka",
-            "Kerala", "Madhya Pradesh", "Maharashtra", "Manipur", "Meghalaya", "Mizoram",
-            "Nagaland", "Odisha", "Punjab", "Rajasthan", "Sikkim", "Tamil Nadu",
-            "Telangana", "Tripura", "Uttar Pradesh", "Uttarakhand", "West Bengal",
-            "Delhi", "Jammu and Kashmir", "Ladakh"
-        ]
-        st.session_state.state = st.selectbox("State *", states_of_india)
+        st.session_state.address = st.text_area("Complete Address *", max_chars=_MAX_ADDRESS_CHARS)
+        st.session_state.state = st.selectbox("State *", _STATES)
 
     _render_case_form()
     _render_evidence_section()
@@ -430,37 +604,47 @@ def _display_main_form():
     
 def _check_required_fields():
     """Checks if all required form fields are filled."""
-    required_fields = [
-        st.session_state.name,
-        st.session_state.phone,
+    ss = st.session_state
+    return bool(ss.get("name") and ss.get("phone") and ss.get("address") and ss.get("description"))
+
+def _combined_inputs():
+    """Returns the generate_combined arguments taken from the current form values."""
+    return (
+        st.session_state.selected_case,
         st.session_state.address,
-        st.session_state.description
-    ]
-    return all(required_fields)
+        st.session_state.state,
+        st.session_state.description,
+        st.session_state.documents,
+        st.session_state.witnesses,
+        st.session_state.additional_info
+    )
 
 def _get_guidance():
     """Triggers the guidance generation process and displays results."""
     if not _check_required_fields():
         st.error("⚠️ Please fill in all required fields marked with *")
     else:
-        st.session_state.guidance = generate_legal_guidance(
-            st.session_state.selected_case,
-            st.session_state.name,
-            st.session_state.phone,
-            st.session_state.email,
-            st.session_state.address,
-            st.session_state.state,
-            st.session_state.form_data,
-            st.session_state.description,
-            st.session_state.documents,
-            st.session_state.witnesses,
-            st.session_state.additional_info
-        )
+        # An English petition draft is produced in the same call.
+        inputs = _combined_inputs()
+        try:
+            result = generate_combined(*inputs)
+        except (httpx.HTTPError, ValueError) as e:
+            st.error(f"Error calling OpenRouter API: {e}")
+            result = None
+        st.session_state.guidance = result["sections"] if result else None
+        st.session_state.combined_petition = None
+        if result and result["petition"]:
+            # Kept unsigned, with the inputs it was drafted from, so Draft Petition can check it is still current.
+            st.session_state.combined_petition = {"inputs": inputs, "petition": result["petition"]}
         if st.session_state.guidance:
             st.success("✅ Legal guidance generated successfully!")
 
+@st.fragment
 def _render_contribute_section():
-    """Renders the contribution pop-up section."""
+    """Renders the contribution pop-up section; runs as a fragment so closing it only reruns this section."""
+    if not st.session_state.show_contribute:
+        return
+
     with st.container():
         st.markdown("---")
         st.subheader("Contribute to Prudentia AI 🚀")
@@ -484,33 +668,30 @@ def _render_contribute_section():
             
             **Join us in shaping Prudentia AI** — let’s build something impactful for the world 🌍✨
         """)
-        st.button("Close", key="close_contribute_button")
+        # A callback, not st.rerun(scope="fragment"): the click may be handled in a full-app run, where a fragment rerun raises.
+        st.button(
+            "Close",
+            key="close_contribute_button",
+            on_click=lambda: st.session_state.update(show_contribute=False)
+        )
         
 # --- 4. Main Application Flow ---
 
 def main():
     """Main function to run the Streamlit app."""
-    # Set up initial session state
-    if "guidance" not in st.session_state:
-        st.session_state.guidance = None
-    if "selected_case" not in st.session_state:
-        st.session_state.selected_case = "Consumer Complaint"
-    if "petition_text" not in st.session_state:
-        st.session_state.petition_text = ""
-    if "show_contribute" not in st.session_state:
-        st.session_state.show_contribute = False
-    
-    # Check if the close button was clicked to reset the state
-    if st.session_state.get("close_contribute_button", False):
-        st.session_state.show_contribute = False
-        st.session_state.close_contribute_button = False
-
     st.set_page_config(
         page_title="Prudentia: Your Legal Companion",
         page_icon="⚖️",
         layout="wide"
     )
 
+    # Set up initial session state
+    st.session_state.setdefault("guidance", None)
+    st.session_state.setdefault("selected_case", "Consumer Complaint")
+    st.session_state.setdefault("petition_text", "")
+    st.session_state.setdefault("combined_petition", None)
+    st.session_state.setdefault("show_contribute", False)
+
     # Layout with columns
     col_empty_left, col_center, col_empty_right = st.columns([1, 4, 1])
 
@@ -524,13 +705,12 @@ def main():
 
         # Renders the results if guidance has already been generated
         if st.session_state.guidance:
-            _render_results_tabs(st.session_state.guidance)
+            _render_results(st.session_state.guidance)
             _render_editable_petition()
             _render_feedback_section()
 
         # Renders the contribution section if the button is clicked
-        if st.session_state.show_contribute:
-            _render_contribute_section()
+        _render_contribute_section()
 
     _render_sidebar()
     
@@ -0,0 +1,32 @@
+import Prudentia
+
+
+def test_sub_heading_does_not_start_a_section():
+    reply = (
+        "## 1. Legal Analysis & Guidance\n"
+        "Overview.\n"
+        "### Your Rights as a Consumer\n"
+        "Sub-heading paragraph.\n"
+        "## 2. Required Documents\n"
+        "Receipts.\n"
+        "## 3. Court Procedure\n"
+        "File at the district commission.\n"
+        "## 4. Your Rights & Remedies\n"
+        "Refund or replacement.\n"
+        "## 5. A Quick Summary\n"
+        "Summary.\n"
+    )
+
+    sections = Prudentia._split_sections(reply)
+
+    assert sections["analysis"].startswith("## 1. Legal Analysis")
+    assert "### Your Rights as a Consumer" in sections["analysis"]
+    assert sections["rights"] == "## 4. Your Rights & Remedies\nRefund or replacement.\n"
+    assert sections["procedure"] == "## 3. Court Procedure\nFile at the district commission.\n"
+
+
+def test_missing_sections_are_empty():
+    sections = Prudentia._split_sections("## Legal Analysis\nOnly this.")
+
+    assert sections["analysis"] == "## Legal Analysis\nOnly this."
+    assert sections["documents"] == sections["procedure"] == sections["rights"] == sections["summary"] == ""